@@ -8,41 +8,90 @@ import numpy as np   # For numerical operations
 
 # Data Visualization
 import matplotlib.pyplot as plt  # For creating static, interactive, and animated visualizations
-import seaborn as sns            # For statistical data visualization
-from scipy.optimize import curve_fit
+from scipy.optimize import least_squares
 
 #import dataset, skipping the first row 
 dataset = pd.read_csv("Lab1_prelab_curve_fitting.csv", skiprows = 1)
 print(dataset)
 
-#define the model function to fit
-def model_function(x, a, b, c):
-    #S = a + be^(cx)
-    return  a + b* np.exp(c*x)
+# Convert the columns to NumPy arrays once so the fit works on plain arrays
+x = dataset['distance (mm)'].to_numpy(dtype=np.float64, copy=False)
+y = dataset['Signal (V)'].to_numpy(dtype=np.float64, copy=False)
 
-#Initial guess
-initial_guess = [1, 1, 1]
+#S = a + be^(cx), given e = e^(cx); the fit reuses a cached e
+def model_from_exp(e, a, b):
+    s = b * e
+    s += a
+    return s
 
-# Use curve_fit to fit the model to the data
-popt, pcov = curve_fit(model_function, dataset['distance (mm)'], dataset['Signal (V)'], p0=initial_guess)
+#define the model function to fit
+def model_function(x, a, b, c):
+    return model_from_exp(np.exp(c*x), a, b)
+
+#define the residual and its analytic Jacobian with respect to a, b and c
+def make_residual_and_jac(x, y):
+    # exp(c*x) from the last evaluation, shared by the residual and the Jacobian
+    cache = {'c': None, 'e': None}
+
+    def exp_term(c):
+        if cache['c'] != c:
+            cache['c'] = c
+            cache['e'] = np.exp(c*x)
+        return cache['e']
+
+    def residual(params):
+        a, b, c = params
+        r = model_from_exp(exp_term(c), a, b)
+        r -= y
+        return r
+
+    def jac(params):
+        a, b, c = params
+        e = exp_term(c)
+        return np.column_stack((np.ones_like(x), e, b*x*e))
+
+    return residual, jac
+
+#Initial guess, solved in closed form through the first, middle and last points
+# With x1 midway between x0 and x2, (y2 - y1)/(y1 - y0) = e^(c*(x2 - x0)/2)
+# y1 is interpolated linearly, so this is exact only when x1 is a sample
+order = np.argsort(x)
+x_sorted, y_sorted = x[order], y[order]
+x0, x2 = x_sorted[0], x_sorted[-1]
+x1 = 0.5 * (x0 + x2)
+y0, y1, y2 = y_sorted[0], np.interp(x1, x_sorted, y_sorted), y_sorted[-1]
+with np.errstate(divide='ignore', invalid='ignore'):
+    c_guess = 2 * np.log((y2 - y1) / (y1 - y0)) / (x2 - x0)
+    b_guess = (y1 - y0) / (np.exp(c_guess*x1) - np.exp(c_guess*x0))
+    initial_guess = [y0 - b_guess*np.exp(c_guess*x0), b_guess, c_guess]
+
+# Fall back to a generic guess when the data is noisy, linear or degenerate
+if not np.all(np.isfinite(initial_guess)):
+    initial_guess = [1, 1, 1]
+
+# Use least_squares (Trust Region Reflective, scaled by the Jacobian) to fit the model to the data
+residual, jac = make_residual_and_jac(x, y)
+result = least_squares(residual, initial_guess, jac=jac, method='trf', x_scale='jac')
+if not result.success:
+    raise RuntimeError(f"Optimal parameters not found: {result.message}")
+popt = result.x
 
 # Get the fitted parameters
 a, b, c = popt
 
-# Formatted to 2 decimal places
-a_formatted = f'{a:.2f}'
-b_formatted = f'{b:.2f}'
-c_formatted = f'{c:.2f}'
 # Calculate the fitted values using the original x-values
-y_fit = model_function(dataset['distance (mm)'], *popt)
+y_fit = model_function(x, *popt)
 
 # Calculate R^2 score manually
 def r2_score(y_true, y_pred):
-    ss_res = np.sum((y_true - y_pred) ** 2)
-    ss_tot = np.sum((y_true - np.mean(y_true)) ** 2)
+    # Sums of squares as dot products, reusing one difference array
+    d = np.subtract(y_true, y_pred, dtype=np.float64)
+    ss_res = np.dot(d, d)
+    np.subtract(y_true, np.mean(y_true), out=d)
+    ss_tot = np.dot(d, d)
     return 1 - (ss_res / ss_tot)
 
-r2 = r2_score(dataset['Signal (V)'], y_fit)
+r2 = r2_score(y, y_fit)
 r2_formatted = f'{r2:.2f}'
 
 # Print fitted parameters and R^2 score
@@ -53,8 +102,8 @@ print(f"R^2 score: {r2_formatted}")
 fig, ax = plt.subplots()
 
 # Plot the data points and fitted curve
-ax.plot(dataset['distance (mm)'], dataset['Signal (V)'], marker='o', label='Data Points')
-ax.plot(dataset['distance (mm)'], y_fit, label=rf'Fitted Line: $S = {a_formatted} + {b_formatted} e^{{({c_formatted} x)}}$', color='red')
+ax.plot(x, y, marker='o', label='Data Points')
+ax.plot(x, y_fit, label=rf'Fitted Line: $S = {a:.2f} + {b:.2f} e^{{({c:.2f} x)}}$', color='red')
 
 # Move the x-axis and y-axis to intersect at zero
 ax.spines['left'].set_position('zero')
@@ -65,8 +114,8 @@ ax.spines['right'].set_color('none')
 ax.spines['top'].set_color('none')
 
 # Set limits to ensure visibility
-ax.set_xlim(min(dataset['distance (mm)']) - 0.05, max(dataset['distance (mm)']) + 0.2)
-ax.set_ylim(min(dataset['Signal (V)']) - 2, max(dataset['Signal (V)']) + 1)
+ax.set_xlim(x.min() - 0.05, x.max() + 0.2)
+ax.set_ylim(y.min() - 2, y.max() + 1)
 
 # Set labels and title
 ax.set_xlabel('Distance (mm)')